@@ -1,14 +1,30 @@
 #!/usr/bin/env python3
 
 import os
+import errno
+import re
 import sys
+import stat
+import struct
+import posixpath
 import time
 import logging
+import signal
+import threading
 from pathlib import Path
 import subprocess
 import shutil
 import hashlib
-import pyinotify
+import functools
+import tempfile
+import json
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PySquashfsImage import SquashFsImage
+except ImportError:
+    SquashFsImage = None  # Optional; icons are then extracted with --appimage-extract
 
 # Setup logging
 logging.basicConfig(
@@ -23,9 +39,173 @@ WATCH_DIR = Path(os.getenv("APPIMAGE_WATCH_DIR", "~/appimages")).expanduser().re
 DESKTOP_DIR = Path(os.getenv("DESKTOP_ENTRY_DIR", "~/.local/share/applications")).expanduser().resolve()
 ICON_DIR = Path(os.getenv("ICON_DIR", "~/.local/share/icons")).expanduser().resolve()
 DESKTOP_SHORTCUTS_DIR = Path("~/Desktop").expanduser().resolve()
+# String forms for os.path calls in per-file loops, where building Path objects adds up
+WATCH_DIR_STR = str(WATCH_DIR)
+ICON_DIR_STR = str(ICON_DIR)
+DESKTOP_ENTRY_DIRS = (str(DESKTOP_DIR), str(DESKTOP_SHORTCUTS_DIR))
+ICON_CACHE_DIR = ICON_DIR / ".cache"
+ICON_CACHE_INDEX = ICON_CACHE_DIR / "index.json"
+STATE_FILE = ICON_CACHE_DIR / "state.json"
+EXTRACT_TMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None  # tmpfs keeps extraction off the disk
+EXTRACT_TIMEOUT = 60  # Seconds before a hung --appimage-extract run is killed
+# Icon search order, precomputed once: formats, then fallback names when no app-named icon exists
+ICON_FORMATS = (".png", ".svg", ".xpm", ".jpg", ".jpeg", ".ico")
+COMMON_ICON_NAMES = (".DirIcon", "icon.png", "icon.svg", "app.png", "app.svg", "application.png", "logo.png")
+ICON_FORMAT_RANK = {fmt: rank for rank, fmt in enumerate(ICON_FORMATS)}
+COMMON_ICON_RANK = {name: rank for rank, name in enumerate(COMMON_ICON_NAMES)}
+ICON_RESOLUTION_RE = re.compile(r"(\d+)x\1")
+# --appimage-extract patterns, tried in order until an icon turns up. The runtime matches them
+# with FNM_PATHNAME | FNM_LEADING_DIR, so "*" stays within one directory and a directory
+# pattern extracts that subtree only.
+ICON_EXTRACT_PATTERNS = (".DirIcon", "{app_name}.png", "{app_name}.svg", "*.png", "*.svg", "*.xpm",
+                         "usr/share/icons", "usr/share/pixmaps")
+REQUIRED_DESKTOP_KEYS = ('[Desktop Entry]', 'Type=Application', 'Exec=', 'Icon=')
+REQUIRED_DESKTOP_KEYS_RE = re.compile("|".join(re.escape(key) for key in REQUIRED_DESKTOP_KEYS))
+# The only .desktop fields the monitor reads back from files it generated
+DESKTOP_FIELD_RE = re.compile(r'^(X-AppImage-(?:Hash|Path|LastUpdate|Mode)|Icon|Comment|Categories|MimeType)=(.*)$', re.M)
+# Fields taken from the AppImage's own desktop entry, with the values used when it has none
+EMBEDDED_DESKTOP_DEFAULTS = {
+    'Comment': 'AppImage application',
+    'Categories': 'Utility;',
+    'MimeType': 'application/x-executable;',
+}
+EMBEDDED_DESKTOP_RE = re.compile(r'^(Comment|Categories|MimeType)=(.*)$', re.M)
+DEBOUNCE_DELAY = 0.5  # Seconds an AppImage must be quiet before it is processed
+FULL_CLEAN_INTERVAL = 60  # Seconds a full cleanup after a moved-out AppImage waits, batching a burst of renames
+RECONCILE_INTERVAL = 3600  # Seconds between full rescans that catch missed events; SIGHUP forces one
 
 SERVICE_NAME = "appimgmon.service"
 SERVICE_FILE_PATH = Path(f"~/.config/systemd/user/{SERVICE_NAME}").expanduser()
+# Unit properties reported by --debug, all fetched with one `systemctl show`
+DEBUG_SERVICE_PROPERTIES = ("LoadState", "ActiveState", "SubState", "UnitFileState", "Result",
+                            "MainPID", "ExecMainStatus", "NRestarts", "ActiveEnterTimestamp", "FragmentPath")
+
+FINGERPRINT_SAMPLE_SIZE = 64 * 1024  # Bytes hashed from each sampled region of an AppImage
+
+# Skeleton of the generated .desktop entries, filled in with str.format_map
+DESKTOP_ENTRY_TEMPLATE = """[Desktop Entry]
+Type=Application
+Name={name}
+Exec="{path}" %F
+Icon={icon}
+Terminal=false
+Comment={Comment}
+Categories={Categories}
+MimeType={MimeType}
+X-AppImage-Version=1.0
+X-AppImage-Path={path}
+X-AppImage-Hash={hash}
+X-AppImage-LastUpdate={mtime_ns}
+X-AppImage-Mode={mode:o}
+"""
+
+# (st_size, st_mtime_ns, permission bits, hash) of AppImages whose desktop entry was last found current,
+# persisted in STATE_FILE so a restart only re-hashes files that changed meanwhile
+processed_files = {}
+
+# Parsed .desktop files keyed by path, with the (mtime_ns, size) they were parsed at
+_desktop_cache = {}
+
+# AppImage hashes keyed by (path, size, mtime_ns) so unchanged files are never re-read
+_hash_cache = {}
+
+# Serializes read-modify-write updates of ICON_CACHE_INDEX from reconcile worker threads
+_icon_cache_lock = threading.Lock()
+
+def _fast_fingerprint(appimage_path):
+    """Return a short fingerprint of the AppImage from its size and sampled regions.
+    
+    The hash only detects changes, so the head, the start of the squashfs
+    payload (its superblock carries the build time and image size) and the
+    tail together with the file size stand in for the whole file.
+    """
+    size = os.stat(appimage_path).st_size
+    h = hashlib.blake2b(str(size).encode(), digest_size=4)
+    with open(appimage_path, 'rb') as f:
+        if size <= 3 * FINGERPRINT_SAMPLE_SIZE:
+            # Small enough to hash whole; stream it rather than read it into one bytes object
+            if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+                return hashlib.file_digest(f, lambda: h).hexdigest()
+            for chunk in iter(functools.partial(f.read, FINGERPRINT_SAMPLE_SIZE), b''):
+                h.update(chunk)
+            return h.hexdigest()
+        
+        offsets = [0, size - FINGERPRINT_SAMPLE_SIZE]
+        try:
+            offsets.insert(1, min(squashfs_offset(appimage_path), size - FINGERPRINT_SAMPLE_SIZE))
+        except (ValueError, struct.error):
+            pass  # Not an ELF runtime; head and tail still cover it
+        
+        for offset in offsets:
+            f.seek(offset)
+            h.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+    return h.hexdigest()
+
+def _file_hash(appimage_path):
+    """Return the AppImage fingerprint, cached on (path, size, mtime_ns)."""
+    st = os.stat(appimage_path)
+    key = (str(appimage_path), st.st_size, st.st_mtime_ns)
+    cached = _hash_cache.get(key)
+    if cached:
+        return cached
+
+    file_hash = _fast_fingerprint(appimage_path)
+    _hash_cache[key] = file_hash
+    return file_hash
+
+def load_state():
+    """Restore processed_files from STATE_FILE and seed the hash cache with it."""
+    try:
+        with open(STATE_FILE) as f:
+            state = json.load(f)
+    except (IOError, OSError, ValueError):
+        return
+    
+    try:
+        for path, (size, mtime_ns, mode, file_hash) in state.items():
+            processed_files[path] = (size, mtime_ns, mode, file_hash)
+            _hash_cache[(path, size, mtime_ns)] = file_hash
+    except (AttributeError, TypeError, ValueError):
+        logging.warning(f"Ignoring malformed state file {STATE_FILE}")
+        processed_files.clear()
+
+def save_state():
+    """Atomically write processed_files to STATE_FILE."""
+    try:
+        tmp_state = STATE_FILE.with_suffix(".tmp")
+        with open(tmp_state, "w") as f:
+            json.dump(processed_files, f)
+        os.replace(tmp_state, STATE_FILE)
+    except (IOError, OSError) as e:
+        logging.warning(f"Failed to save state to {STATE_FILE}: {e}")
+
+def record_processed(appimage_path, file_hash=None):
+    """Remember that the desktop entry for an AppImage is current."""
+    try:
+        st = os.stat(appimage_path)
+        if file_hash is None:
+            file_hash = _file_hash(appimage_path)
+    except OSError:
+        return
+    processed_files[str(appimage_path)] = (st.st_size, st.st_mtime_ns, stat.S_IMODE(st.st_mode), file_hash)
+    _hash_cache[(str(appimage_path), st.st_size, st.st_mtime_ns)] = file_hash
+
+def _ensure_dir(path):
+    """Create a directory and its parents unless it already exists; one stat when it does."""
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+
+def _discard_file(path):
+    """Remove a file if it exists, never raising, so cleanup can't mask the original error."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+@functools.lru_cache(maxsize=1)
+def _python3_path():
+    """Return the python3 executable on PATH, looked up once per run."""
+    return shutil.which('python3')
 
 def ensure_script_in_watch_dir():
     """Ensure the script is in the watch directory and return its path."""
@@ -33,7 +213,7 @@ def ensure_script_in_watch_dir():
     target_script = WATCH_DIR / "AppImgMon.py"
     
     # Create watch directory if it doesn't exist
-    WATCH_DIR.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(WATCH_DIR)
     
     # If script is not in watch directory, copy it there
     if current_script != target_script:
@@ -43,124 +223,367 @@ def ensure_script_in_watch_dir():
     
     return target_script
 
+def load_icon_cache():
+    """Load the icon cache index, mapping AppImage hashes to icon extension and embedded fields."""
+    try:
+        with open(ICON_CACHE_INDEX) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+def _update_icon_cache_index(file_hash, **fields):
+    """Merge fields into the index entry for an AppImage hash and rewrite the index atomically."""
+    _ensure_dir(ICON_CACHE_DIR)  # May have been cleared while running
+    with _icon_cache_lock:
+        index = load_icon_cache()
+        index.setdefault(file_hash, {}).update(fields)
+        tmp_index = ICON_CACHE_INDEX.with_suffix(".tmp")
+        with open(tmp_index, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_index, ICON_CACHE_INDEX)
+
+def store_cached_icon(file_hash, icon_file, embedded=None):
+    """Copy an icon extracted from this AppImage content into the cache, with its embedded fields."""
+    try:
+        _ensure_dir(ICON_CACHE_DIR)
+        shutil.copyfile(icon_file, ICON_CACHE_DIR / f"{file_hash}{icon_file.suffix}")
+        _update_icon_cache_index(file_hash, ext=icon_file.suffix, desktop=embedded or {})
+    except (IOError, OSError) as e:
+        logging.warning(f"Failed to cache icon {icon_file}: {e}")
+
+def store_embedded_fields(file_hash, embedded):
+    """Record the embedded fields of an AppImage's content without caching an icon for it."""
+    try:
+        _update_icon_cache_index(file_hash, desktop=embedded)
+    except (IOError, OSError) as e:
+        logging.warning(f"Failed to cache desktop entry fields for {file_hash}: {e}")
+
+def icon_rank(relpath, app_name):
+    """Return a sort key for an icon candidate path, or None if it is not one."""
+    name = os.path.basename(relpath)
+    stem, suffix = os.path.splitext(name)
+    suffix = suffix.lower()
+    if stem == app_name and suffix in ICON_FORMAT_RANK:
+        name_rank = (0, 0)
+    elif name in COMMON_ICON_RANK:
+        name_rank = (1, COMMON_ICON_RANK[name])
+    else:
+        return None
+    
+    # Prefer app-named icons, then larger resolutions, then format order
+    match = ICON_RESOLUTION_RE.search(relpath)
+    resolution = int(match.group(1)) if match else 0
+    return (name_rank, -resolution, ICON_FORMAT_RANK.get(suffix, len(ICON_FORMATS)))
+
+def find_icon_candidate(squashfs_root, app_name):
+    """Walk the extracted tree once and return the best icon file, if any."""
+    root = str(squashfs_root)
+    candidates = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            rank = icon_rank(os.path.relpath(path, root), app_name)
+            
+            # Only ranked names are stat'ed, to skip dangling symlinks
+            if rank is None or not os.path.isfile(path):
+                continue
+            candidates.append((rank, path))
+    
+    if not candidates:
+        return None
+    return Path(min(candidates)[-1])
+
+def squashfs_offset(appimage_path):
+    """Return the offset of the squashfs payload that follows the ELF runtime."""
+    with open(appimage_path, 'rb') as f:
+        ident = f.read(16)
+        if ident[:4] != b"\x7fELF":
+            raise ValueError(f"{appimage_path} is not an ELF file")
+        
+        # The runtime ends where its section header table ends
+        endian = "<" if ident[5] == 1 else ">"
+        if ident[4] == 2:  # 64-bit
+            f.seek(0x28)
+            shoff, = struct.unpack(endian + "Q", f.read(8))
+            f.seek(0x3A)
+        else:
+            f.seek(0x20)
+            shoff, = struct.unpack(endian + "I", f.read(4))
+            f.seek(0x2E)
+        shentsize, shnum = struct.unpack(endian + "HH", f.read(4))
+    
+    return shoff + shentsize * shnum
+
+def parse_embedded_desktop(content):
+    """Return the EMBEDDED_DESKTOP_DEFAULTS fields set in a desktop entry's [Desktop Entry] group."""
+    start = content.find('[Desktop Entry]')
+    if start < 0:
+        return {}
+    group = content[start:]
+    end = group.find('\n[')
+    if end >= 0:
+        group = group[:end]
+    
+    fields = {}
+    for key, value in EMBEDDED_DESKTOP_RE.findall(group):
+        if value.strip():
+            fields.setdefault(key, value.strip())
+    return fields
+
+def _resolve_squashfs_entry(image, entry):
+    """Return the regular file an image entry is or links to, or None."""
+    # Resolve symlinks such as .DirIcon against the image root
+    if entry.is_symlink:
+        relpath = entry.path.lstrip("/")
+        link = posixpath.normpath(posixpath.join(posixpath.dirname(relpath), entry.readlink()))
+        entry = image.select("/" + link.lstrip("/"))
+    return entry if entry is not None and entry.is_file else None
+
+def read_icon_from_squashfs(appimage_path, app_name):
+    """Read the best icon straight from the AppImage's embedded squashfs.
+    
+    Returns (icon_name, icon_data, embedded_fields), or None when
+    PySquashfsImage is not installed, the image cannot be read or it has
+    no icon.
+    """
+    if SquashFsImage is None:
+        return None
+    
+    try:
+        offset = squashfs_offset(appimage_path)
+        with SquashFsImage.from_file(str(appimage_path), offset=offset) as image:
+            candidates = []
+            embedded = None
+            for entry in image:
+                if entry.is_dir:
+                    continue
+                relpath = entry.path.lstrip("/")
+                
+                # The AppImage's own desktop entry sits at the image root
+                if embedded is None and "/" not in relpath and relpath.endswith(".desktop"):
+                    target = _resolve_squashfs_entry(image, entry)
+                    if target is not None:
+                        embedded = parse_embedded_desktop(target.read_bytes().decode("utf-8", "replace"))
+                    continue
+                
+                rank = icon_rank(relpath, app_name)
+                if rank is None:
+                    continue
+                target = _resolve_squashfs_entry(image, entry)
+                if target is None:
+                    continue
+                candidates.append((rank, relpath, target))
+            
+            if not candidates:
+                return None
+            _, _, best = min(candidates, key=lambda c: c[:2])
+            return best.name, best.read_bytes(), embedded or {}
+    except Exception as e:
+        logging.debug(f"Could not read squashfs of {appimage_path} directly: {e}")
+        return None
+
+def _appimage_extract(appimage_path, tmpdir, pattern):
+    """Run the AppImage's --appimage-extract for pattern, unpacking into tmpdir/squashfs-root."""
+    subprocess.run([str(appimage_path), "--appimage-extract", pattern], cwd=tmpdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=EXTRACT_TIMEOUT)
+
+def _extract_link_target(appimage_path, tmpdir, link):
+    """Extract the target of a dangling symlink in the unpacked tree."""
+    # .DirIcon and the root desktop entry are usually symlinks, so pull in their targets too
+    if link.is_symlink() and not link.exists():
+        target = os.path.normpath(os.readlink(link))
+        if not os.path.isabs(target) and not target.startswith(".."):
+            _appimage_extract(appimage_path, tmpdir, target)
+
+def _extract_embedded_desktop(appimage_path, tmpdir):
+    """Unpack the desktop entry at the image root into tmpdir and return its embedded fields."""
+    # The runtime matches with FNM_PATHNAME, so this only takes the desktop entry at the root
+    _appimage_extract(appimage_path, tmpdir, "*.desktop")
+    squashfs_root = os.path.join(tmpdir, "squashfs-root")
+    if not os.path.isdir(squashfs_root):
+        return {}
+    for entry in os.scandir(squashfs_root):
+        if entry.name.endswith(".desktop"):
+            _extract_link_target(appimage_path, tmpdir, Path(entry.path))
+            try:
+                with open(entry.path, errors="replace") as f:
+                    return parse_embedded_desktop(f.read())
+            except (IOError, OSError):
+                continue
+    return {}
+
+def read_embedded_desktop(appimage_path):
+    """Return the embedded fields of an AppImage's own desktop entry, without looking for icons."""
+    if SquashFsImage is not None:
+        try:
+            with SquashFsImage.from_file(str(appimage_path), offset=squashfs_offset(appimage_path)) as image:
+                for entry in image.root:
+                    if entry.name.endswith(".desktop") and not entry.is_dir:
+                        target = _resolve_squashfs_entry(image, entry)
+                        if target is not None:
+                            return parse_embedded_desktop(target.read_bytes().decode("utf-8", "replace"))
+                return {}
+        except Exception as e:
+            logging.debug(f"Could not read squashfs of {appimage_path} directly: {e}")
+    
+    tmpdir = tempfile.mkdtemp(prefix="appimgmon-", dir=EXTRACT_TMP_DIR)
+    try:
+        return _extract_embedded_desktop(appimage_path, tmpdir)
+    except (IOError, OSError, subprocess.SubprocessError) as e:
+        logging.warning(f"Could not read the desktop entry of {appimage_path}: {e}")
+        return {}
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
 def extract_icon(appimage_path, app_name):
-    """Extract icon from AppImage using common locations and formats."""
-    # Supported icon formats
-    icon_formats = [".png", ".svg", ".xpm", ".jpg", ".jpeg", ".ico"]
-    icon_resolutions = ["512x512", "256x256", "128x128", "64x64", "48x48", "32x32"]
+    """Return the icon for an AppImage, extracting it only when needed.
+    
+    Returns (icon, embedded_fields), where embedded_fields holds the
+    EMBEDDED_DESKTOP_DEFAULTS keys found in the AppImage's own desktop entry.
+    Treat the returned dict as read-only; it may be cached.
+    """
+    st = os.stat(appimage_path)
     
-    # Try to find an existing icon first
-    for fmt in icon_formats:
-        icon_path = ICON_DIR / f"{app_name}{fmt}"
-        if icon_path.exists():
-            return icon_path
+    # An icon written after the AppImage was last modified is still current
+    icon_base = os.path.join(ICON_DIR_STR, app_name)
+    for fmt in ICON_FORMATS:
+        try:
+            if os.stat(icon_base + fmt).st_mtime_ns >= st.st_mtime_ns:
+                return Path(icon_base + fmt), _cached_embedded_fields(appimage_path)
+        except FileNotFoundError:
+            continue
     
-    # Default to PNG for new icons
-    icon_path = ICON_DIR / f"{app_name}.png"
+    # The mode is part of the key so a failed attempt is retried once the file is made executable
+    key = (str(appimage_path), st.st_mtime_ns, st.st_size, st.st_mode, app_name)
+    icon, embedded = _cached_icon(*key)
+    if os.path.isabs(icon) and not os.path.exists(icon):
+        # The memoized icon was deleted since; lru_cache can't drop one key, so start over
+        _cached_icon.cache_clear()
+        icon, embedded = _cached_icon(*key)
+    return icon, embedded
+
+def _cached_embedded_fields(appimage_path):
+    """Return the embedded fields of an AppImage whose icon is already current.
     
+    They come from the icon cache index when it has them; otherwise they are
+    read from the AppImage and recorded in the index, so that happens once
+    per AppImage version. The icon itself is not cached here: it was not
+    extracted from this content, so it may not belong to it.
+    """
     try:
-        # Extract AppImage contents
-        subprocess.run([str(appimage_path), "--appimage-extract"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        squashfs_root = Path("squashfs-root")
-        
-        if not squashfs_root.exists():
-            logging.warning(f"Failed to extract {appimage_path}")
-            return "application-x-executable"
-        
-        # Common icon locations to check
-        base_locations = [
-            ".",  # Root directory
-            "usr/share/icons/hicolor/{resolution}/apps",
-            "usr/share/icons/default/{resolution}/apps",
-            "usr/share/icons",
-            "usr/share/pixmaps",
-            ".local/share/icons",
-            f"opt/{app_name}/icons",
-            "AppRun",
-        ]
+        file_hash = _file_hash(appimage_path)
+    except (IOError, OSError):
+        return {}
+    cached = load_icon_cache().get(file_hash)
+    if cached is not None and 'desktop' in cached:
+        return cached['desktop']
+    
+    embedded = read_embedded_desktop(appimage_path)
+    store_embedded_fields(file_hash, embedded)
+    return embedded
+
+@functools.lru_cache(maxsize=256)
+def _cached_icon(path_str, mtime_ns, size, mode, app_name):
+    """Memoize icon and embedded desktop entry extraction per AppImage version."""
+    return _extract_icon_uncached(Path(path_str), app_name)
+
+def _extract_icon_uncached(appimage_path, app_name):
+    """Extract icon and desktop entry from AppImage, unpacking only files that can be either."""
+    # Reuse an icon already extracted from identical AppImage content
+    try:
+        file_hash = _file_hash(appimage_path)
+        cached = load_icon_cache().get(file_hash)
+        if cached is not None and 'ext' in cached:
+            cached_icon = ICON_CACHE_DIR / f"{file_hash}{cached['ext']}"
+            if cached_icon.exists():
+                icon_path = ICON_DIR / f"{app_name}{cached['ext']}"
+                shutil.copyfile(cached_icon, icon_path)
+                return icon_path, _cached_embedded_fields(appimage_path)
+    except (IOError, OSError) as e:
+        logging.warning(f"Icon cache lookup failed for {appimage_path}: {e}")
+        file_hash = None
+    
+    # Read the icon straight out of the image when possible, without running it
+    direct_icon = read_icon_from_squashfs(appimage_path, app_name)
+    if direct_icon:
+        icon_name, icon_data, embedded = direct_icon
+        icon_ext = os.path.splitext(icon_name)[1].lower()
+        icon_path = ICON_DIR / f"{app_name}{icon_ext if icon_ext in ICON_FORMAT_RANK else '.png'}"
+        try:
+            with open(icon_path, "wb") as f:
+                f.write(icon_data)
+            logging.info(f"Read icon {icon_name} from {appimage_path} into {icon_path}")
+            if file_hash:
+                store_cached_icon(file_hash, icon_path, embedded)
+            return icon_path, embedded
+        except (IOError, OSError) as e:
+            logging.error(f"Failed to write icon {icon_path}: {e}")
+            return "application-x-executable", embedded
+    
+    icon_file = None
+    embedded = {}
+    
+    # Fall back to the runtime; extract into a private directory so concurrent extractions don't collide
+    tmpdir = tempfile.mkdtemp(prefix="appimgmon-", dir=EXTRACT_TMP_DIR)
+    try:
+        squashfs_root = Path(tmpdir) / "squashfs-root"
         
-        icon_found = False
+        embedded = _extract_embedded_desktop(appimage_path, tmpdir)
         
-        # First, try to find icons with the app name
-        for base_loc in base_locations:
-            if icon_found:
+        # Extract icon candidates only, cheapest pattern first, instead of the whole image
+        for pattern in ICON_EXTRACT_PATTERNS:
+            _appimage_extract(appimage_path, tmpdir, pattern.format(app_name=app_name))
+            _extract_link_target(appimage_path, tmpdir, squashfs_root / ".DirIcon")
+            
+            icon_file = find_icon_candidate(squashfs_root, app_name)
+            if icon_file:
                 break
-                
-            # Handle resolution placeholder
-            if "{resolution}" in base_loc:
-                for res in icon_resolutions:
-                    loc = Path(base_loc.format(resolution=res))
-                    for fmt in icon_formats:
-                        icon_file = squashfs_root / loc / f"{app_name}{fmt}"
-                        if icon_file.exists():
-                            shutil.copy2(icon_file, icon_path)
-                            icon_found = True
-                            logging.info(f"Found and copied icon from {icon_file} to {icon_path}")
-                            break
-            else:
-                # Try without resolution
-                loc = Path(base_loc)
-                for fmt in icon_formats:
-                    icon_file = squashfs_root / loc / f"{app_name}{fmt}"
-                    if icon_file.exists():
-                        shutil.copy2(icon_file, icon_path)
-                        icon_found = True
-                        logging.info(f"Found and copied icon from {icon_file} to {icon_path}")
-                        break
         
-        # If no app-named icon found, try common icon names
-        if not icon_found:
-            common_icon_names = [".DirIcon", "icon.png", "icon.svg", "app.png", "app.svg", "application.png", "logo.png"]
-            for base_loc in base_locations:
-                if icon_found:
-                    break
-                    
-                # Skip resolution-based paths for common names
-                if "{resolution}" in base_loc:
-                    continue
-                    
-                loc = Path(base_loc)
-                for icon_name in common_icon_names:
-                    icon_file = squashfs_root / loc / icon_name
-                    if icon_file.exists():
-                        shutil.copy2(icon_file, icon_path)
-                        icon_found = True
-                        logging.info(f"Found and copied icon from {icon_file} to {icon_path}")
-                        break
+        if not squashfs_root.exists():
+            logging.warning(f"Failed to extract {appimage_path}")
+            return "application-x-executable", embedded
+        
+        if icon_file:
+            # Keep the original format; .DirIcon has no suffix and is almost always PNG
+            icon_ext = icon_file.suffix.lower() if icon_file.suffix.lower() in ICON_FORMAT_RANK else ".png"
+            icon_path = ICON_DIR / f"{app_name}{icon_ext}"
+            shutil.copyfile(icon_file, icon_path)
+            logging.info(f"Found and copied icon from {icon_file} to {icon_path}")
+            if file_hash:
+                store_cached_icon(file_hash, icon_path, embedded)
         
     except Exception as e:
         logging.error(f"Error extracting icon from {appimage_path}: {str(e)}")
-        return "application-x-executable"
+        return "application-x-executable", embedded
     finally:
         # Clean up extracted files
-        if Path("squashfs-root").exists():
-            try:
-                shutil.rmtree("squashfs-root")
-            except Exception as e:
-                logging.error(f"Failed to clean up squashfs-root: {str(e)}")
+        shutil.rmtree(tmpdir, ignore_errors=True)
     
     # Return the icon path or fallback
-    if icon_found:
-        return icon_path
+    if icon_file:
+        return icon_path, embedded
     else:
         logging.warning(f"No icon found for {app_name}, using fallback")
-        return "application-x-executable"
+        return "application-x-executable", embedded
 
-def validate_desktop_shortcut(desktop_file_path):
-    """Validate and fix desktop shortcut permissions and content."""
+def validate_desktop_shortcut(desktop_file_path, *, assume_mode=None):
+    """Validate and fix desktop shortcut permissions and content.
+    
+    Callers that already know the file's permission bits pass them as
+    assume_mode, which is used in place of a stat.
+    """
     try:
         if not desktop_file_path.exists():
             return False
             
         # Check permissions
-        current_perms = os.stat(desktop_file_path).st_mode & 0o777
+        current_perms = assume_mode if assume_mode is not None else os.stat(desktop_file_path).st_mode & 0o777
         if current_perms != 0o755:
             os.chmod(desktop_file_path, 0o755)
             
-        # Validate content
+        # Validate content in a single scan for all required keys
         with open(desktop_file_path, 'r') as f:
-            content = f.read()
-            if not all(key in content for key in ['[Desktop Entry]', 'Type=Application', 'Exec=', 'Icon=']):
+            found = set(REQUIRED_DESKTOP_KEYS_RE.findall(f.read()))
+            if len(found) != len(REQUIRED_DESKTOP_KEYS):
                 return False
                 
         return True
@@ -168,49 +591,116 @@ def validate_desktop_shortcut(desktop_file_path):
         logging.error(f"Error validating desktop shortcut {desktop_file_path}: {e}")
         return False
 
-def create_desktop_file(appimage_path):
-    """Generate a .desktop file for the given AppImage."""
+def read_desktop_fields(desktop_file_path):
+    """Return the Icon and X-AppImage-* fields of a .desktop file, or {} if it can't be read.
+    
+    Parsed files are cached until their mtime or size changes; treat the
+    returned dict as read-only.
+    """
+    key = str(desktop_file_path)
+    try:
+        st = os.stat(key)
+        cached = _desktop_cache.get(key)
+        if cached and cached[0] == (st.st_mtime_ns, st.st_size):
+            return cached[1]
+        with open(key, 'r') as f:
+            content = f.read()
+    except (IOError, OSError):
+        _desktop_cache.pop(key, None)
+        return {}
+    
+    fields = dict(DESKTOP_FIELD_RE.findall(content))
+    _desktop_cache[key] = ((st.st_mtime_ns, st.st_size), fields)
+    return fields
+
+def unlink_desktop_file(desktop_file_path):
+    """Delete a .desktop file and drop it from the parse cache."""
+    os.unlink(desktop_file_path)
+    _desktop_cache.pop(str(desktop_file_path), None)
+
+def create_desktop_file(appimage_path, metadata=None):
+    """Generate a .desktop file for the given AppImage (a str or Path).
+    
+    metadata is the dict from get_appimage_metadata when the caller already
+    has it, which saves hashing the AppImage again.
+    """
     try:
-        appimage_name = appimage_path.name
-        app_name = appimage_path.stem
+        app_name = os.path.basename(appimage_path)[:-len('.AppImage')]
         desktop_file_path = DESKTOP_DIR / f"{app_name}.desktop"
         
-        # Extract icon
-        icon_path = extract_icon(appimage_path, app_name)
-        
         # Calculate unique identifier for the AppImage
-        with open(appimage_path, 'rb') as f:
-            file_hash = hashlib.md5(f.read()).hexdigest()[:8]
+        if metadata is None:
+            metadata = get_appimage_metadata(appimage_path)
+            if metadata is None:
+                return False
+        file_hash = metadata['hash']
+        
+        # The icon and embedded fields are content-derived, so keep the current ones if the hash is unchanged
+        stored = read_desktop_fields(desktop_file_path)
+        stored_icon = stored.get('Icon', '')
+        if stored.get('X-AppImage-Hash') == file_hash and os.path.isabs(stored_icon) and os.path.exists(stored_icon):
+            icon_path = stored_icon
+            embedded = {key: stored[key] for key in EMBEDDED_DESKTOP_DEFAULTS if key in stored}
+        else:
+            icon_path, embedded = extract_icon(appimage_path, app_name)
         
         # Generate the .desktop entry with additional metadata
-        desktop_content = f"""[Desktop Entry]
-Type=Application
-Name={app_name}
-Exec="{appimage_path}" %F
-Icon={icon_path}
-Terminal=false
-Comment=AppImage application
-Categories=Utility;
-MimeType=application/x-executable;
-X-AppImage-Version=1.0
-X-AppImage-Path={appimage_path}
-X-AppImage-Hash={file_hash}
-X-AppImage-LastUpdate={int(time.time())}
-"""
-        # Write the .desktop file
-        with open(desktop_file_path, "w") as f:
-            f.write(desktop_content)
-        os.chmod(desktop_file_path, 0o755)  # Make the .desktop file executable
+        desktop_content = DESKTOP_ENTRY_TEMPLATE.format_map({
+            'name': app_name,
+            'path': appimage_path,
+            'icon': icon_path,
+            'hash': file_hash,
+            'mtime_ns': metadata['mtime_ns'],
+            'mode': metadata['mode'],
+            **EMBEDDED_DESKTOP_DEFAULTS,
+            **embedded,
+        })
+        # Leave the entry and shortcut untouched when nothing changed
+        try:
+            if desktop_file_path.read_bytes() == desktop_content.encode():
+                logging.debug(f"Desktop file for {app_name} is already up to date")
+                return True
+        except (IOError, OSError):
+            pass
+        
+        # Write the .desktop file atomically so readers never see a partial entry, through a
+        # unique hidden temp file so an unrelated <app>.tmp is never overwritten
+        fd, tmp_path = tempfile.mkstemp(dir=DESKTOP_DIR, prefix=f".{app_name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(desktop_content)
+            os.chmod(tmp_path, 0o755)  # Make the .desktop file executable
+            os.replace(tmp_path, desktop_file_path)
+        except BaseException:
+            # Also on SystemExit from the SIGTERM handler, so no temp file is left behind
+            _discard_file(tmp_path)
+            raise
         logging.info(f"Created .desktop file for {app_name} at {desktop_file_path}")
         
         # Create desktop shortcut if enabled
         if CREATE_DESKTOP_SHORTCUTS:
             desktop_shortcut = DESKTOP_SHORTCUTS_DIR / f"{app_name}.desktop"
             try:
-                shutil.copy2(desktop_file_path, desktop_shortcut)
-                os.chmod(desktop_shortcut, 0o755)  # Make the desktop shortcut executable
+                # Take a unique hidden name next to the shortcut, so no user file is ever clobbered
+                fd, tmp_shortcut = tempfile.mkstemp(dir=DESKTOP_SHORTCUTS_DIR, prefix=f".{app_name}.", suffix=".tmp")
+                os.close(fd)
+                try:
+                    # Hardlink the entry (it already has mode 0755); copy only across filesystems.
+                    # os.link can't replace the placeholder, so free the name just before linking
+                    os.unlink(tmp_shortcut)
+                    try:
+                        os.link(desktop_file_path, tmp_shortcut)
+                    except OSError as e:
+                        if e.errno not in (errno.EXDEV, errno.EPERM):
+                            raise
+                        shutil.copyfile(desktop_file_path, tmp_shortcut)
+                        os.chmod(tmp_shortcut, 0o755)  # Make the desktop shortcut executable
+                    os.replace(tmp_shortcut, desktop_shortcut)
+                except BaseException:
+                    _discard_file(tmp_shortcut)
+                    raise
                 
-                if validate_desktop_shortcut(desktop_shortcut):
+                if validate_desktop_shortcut(desktop_shortcut, assume_mode=0o755):
                     logging.info(f"Created and validated desktop shortcut at {desktop_shortcut}")
                 else:
                     logging.warning(f"Desktop shortcut created but validation failed: {desktop_shortcut}")
@@ -218,121 +708,331 @@ X-AppImage-LastUpdate={int(time.time())}
             except (IOError, OSError) as e:
                 logging.error(f"Failed to create desktop shortcut for {app_name}: {e}")
                 
+        return True
     except Exception as e:
         logging.error(f"Failed to create desktop entry for {appimage_path}: {e}")
+        return False
 
-def clean_desktop_files():
-    """Remove .desktop files for AppImages that no longer exist."""
+def clean_desktop_files(removed_files=None):
+    """Remove .desktop files for AppImages that no longer exist.
+    
+    When removed_files is given only the entries named after those AppImages
+    are checked; otherwise every .desktop file is scanned (full reconcile).
+    """
+    if removed_files is not None:
+        removed_count = 0
+        for appimage_path in removed_files:
+            appimage_path = str(appimage_path)
+            if os.path.exists(appimage_path):
+                continue
+            desktop_name = os.path.basename(appimage_path)[:-len('.AppImage')] + ".desktop"
+            for location in DESKTOP_ENTRY_DIRS:
+                desktop_file = os.path.join(location, desktop_name)
+                if read_desktop_fields(desktop_file).get("X-AppImage-Path") != appimage_path:
+                    continue
+                try:
+                    logging.info(f"Deleting: {desktop_file}")
+                    unlink_desktop_file(desktop_file)
+                    removed_count += 1
+                except FileNotFoundError:
+                    continue
+                except (IOError, OSError) as e:
+                    logging.error(f"Error cleaning up desktop file {desktop_file}: {e}")
+        logging.info(f"Removed {removed_count} desktop files.")
+        return
+    
     logging.info("Starting cleanup of desktop files...")
     removed_count = 0
     
+    # One directory scan answers "does it still exist?" for every entry pointing into WATCH_DIR
+    try:
+        live = {str(appimage) for appimage in scan_appimages()}
+    except OSError as e:
+        logging.warning(f"Could not scan {WATCH_DIR}, checking entries one by one: {e}")
+        live = None
+    
     # Clean up both desktop dir and desktop shortcuts
-    for location in [DESKTOP_DIR, DESKTOP_SHORTCUTS_DIR]:
+    for location in DESKTOP_ENTRY_DIRS:
         logging.info(f"Checking directory: {location}")
-        for desktop_file in location.glob("*.desktop"):
+        try:
+            with os.scandir(location) as entries:
+                desktop_files = [entry.path for entry in entries
+                                 if entry.name.endswith(".desktop") and entry.is_file()]
+        except FileNotFoundError:
+            continue
+        
+        for desktop_file in desktop_files:
             try:
-                with open(desktop_file) as f:
-                    content = f.read()
-                    if "X-AppImage-Path=" in content:
-                        # Extract the AppImage path
-                        for line in content.splitlines():
-                            if line.startswith("X-AppImage-Path="):
-                                appimage_path = Path(line.split("=", 1)[1].strip())
-                                if not appimage_path.exists():
-                                    logging.info(f"Removing desktop file for missing AppImage: {appimage_path}")
-                                    logging.info(f"Deleting: {desktop_file}")
-                                    desktop_file.unlink()
-                                    removed_count += 1
-                                    break
+                # Extract the AppImage path; unchanged files come from the parse cache
+                stored_path = read_desktop_fields(desktop_file).get("X-AppImage-Path")
+                if stored_path:
+                    stored_path = stored_path.strip()
+                    if live is not None and os.path.dirname(stored_path) == WATCH_DIR_STR and _is_appimage(stored_path):
+                        missing = stored_path not in live
+                    else:
+                        missing = not os.path.exists(stored_path)
+                    if missing:
+                        logging.info(f"Removing desktop file for missing AppImage: {stored_path}")
+                        logging.info(f"Deleting: {desktop_file}")
+                        unlink_desktop_file(desktop_file)
+                        removed_count += 1
             except (IOError, OSError) as e:
                 logging.error(f"Error cleaning up desktop file {desktop_file}: {e}")
     
     logging.info(f"Cleanup complete. Removed {removed_count} desktop files.")
 
+def ensure_directories():
+    """Create the watch, desktop entry and icon directories if missing."""
+    for directory in (WATCH_DIR, DESKTOP_DIR, ICON_DIR, ICON_CACHE_DIR):
+        _ensure_dir(directory)
+
+def _is_appimage(path):
+    """Return whether a path names an AppImage, going by its suffix."""
+    return path.endswith('.AppImage')
+
+def scan_appimages():
+    """Return the AppImages currently in the watch directory."""
+    # scandir gives names and file types without building a Path per entry
+    with os.scandir(WATCH_DIR) as entries:
+        return [Path(entry.path) for entry in entries
+                if _is_appimage(entry.name) and entry.is_file()]
+
+def refresh_desktop_file(appimage_path, metadata=None):
+    """Create the desktop entry for an AppImage and return its hash, or None on failure."""
+    if not create_desktop_file(appimage_path, metadata=metadata):
+        return None
+    return metadata['hash'] if metadata else _file_hash(appimage_path)
+
+def update_appimage(appimage_path):
+    """Refresh the desktop entry for one AppImage (a str or Path) if it is out of date."""
+    if not os.path.exists(appimage_path):
+        return
+    desktop_file = DESKTOP_DIR / (os.path.basename(appimage_path)[:-len('.AppImage')] + ".desktop")
+    needs, metadata = needs_update(appimage_path, desktop_file)
+    if needs and create_desktop_file(appimage_path, metadata=metadata):
+        record_processed(appimage_path)
+        save_state()
+
+def reconcile_appimages():
+    """Bring desktop entries in line with the watch directory contents."""
+    current = set()
+    stale = []
+    stale_metadata = []
+    for appimage in scan_appimages():
+        try:
+            st = os.stat(appimage)
+        except OSError:
+            continue
+        key = str(appimage)
+        current.add(key)
+        desktop_file = DESKTOP_DIR / f"{appimage.stem}.desktop"
+        
+        # Unchanged since it was last found current: one stat, no desktop file read or hash
+        known = processed_files.get(key)
+        if known and known[:3] == (st.st_size, st.st_mtime_ns, stat.S_IMODE(st.st_mode)) and desktop_file.exists():
+            continue
+        needs, metadata = needs_update(appimage, desktop_file)
+        if needs:
+            stale.append(appimage)
+            stale_metadata.append(metadata)
+        else:
+            # Current by mtime and mode, so the hash the entry records is the AppImage's hash
+            record_processed(appimage, read_desktop_fields(desktop_file).get('X-AppImage-Hash'))
+    
+    # Each AppImage is independent and the work is I/O and subprocess bound, so threads overlap it
+    if len(stale) > 1:
+        with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(stale))) as executor:
+            hashes = list(executor.map(refresh_desktop_file, stale, stale_metadata))
+    else:
+        hashes = [refresh_desktop_file(appimage, metadata) for appimage, metadata in zip(stale, stale_metadata)]
+    
+    # Forget removed AppImages and ones whose entry could not be written
+    for appimage, file_hash in zip(stale, hashes):
+        if file_hash:
+            record_processed(appimage, file_hash)
+        else:
+            current.discard(str(appimage))
+    for key in set(processed_files) - current:
+        del processed_files[key]
+    save_state()
+    
+    clean_desktop_files()
+
 def monitor_appimages():
     """Monitor the directory for AppImage changes using inotify."""
-    class EventHandler(pyinotify.ProcessEvent):
-        def process_default(self, event):
-            """Only log specific events we care about"""
-            if any(x in event.maskname for x in ['IN_CREATE', 'IN_DELETE', 'IN_MODIFY', 'IN_MOVED']):
-                logging.debug(f"Received event: {event.maskname} for {event.pathname}")
-
-        def process_IN_CREATE(self, event):
-            if event.pathname.endswith('.AppImage'):
-                path = Path(event.pathname)
-                logging.debug(f"CREATE event detected: {event.pathname}")
-                logging.info(f"New AppImage detected: {path}")
-                create_desktop_file(path)
-
-        def process_IN_DELETE(self, event):
-            if event.pathname.endswith('.AppImage'):
-                path = Path(event.pathname)
-                logging.debug(f"DELETE event detected: {event.pathname}")
-                logging.info(f"AppImage removed: {path}")
-                logging.info("Initiating desktop file cleanup...")
-                clean_desktop_files()
-                logging.info("Desktop file cleanup completed")
-
-        def process_IN_MODIFY(self, event):
-            if event.pathname.endswith('.AppImage'):
-                path = Path(event.pathname)
-                desktop_file = DESKTOP_DIR / f"{path.stem}.desktop"
-                if needs_update(path, desktop_file):
-                    logging.debug(f"MODIFY event detected: {event.pathname}")
-                    logging.info(f"AppImage modified: {path}")
-                    create_desktop_file(path)
-
-        def process_IN_MOVED_FROM(self, event):
-            if event.pathname.endswith('.AppImage'):
-                path = Path(event.pathname)
-                logging.debug(f"MOVED_FROM event detected: {event.pathname}")
-                logging.info(f"AppImage moved/renamed from: {path}")
-                clean_desktop_files()
-
-        def process_IN_MOVED_TO(self, event):
-            if event.pathname.endswith('.AppImage'):
-                path = Path(event.pathname)
-                logging.debug(f"MOVED_TO event detected: {event.pathname}")
-                logging.info(f"AppImage moved/renamed to: {path}")
-                create_desktop_file(path)
+    # Only the monitor needs inotify_simple; --install and --debug work without it
+    from inotify_simple import INotify, flags
+    
+    watch_path = str(WATCH_DIR)
+    
+    # Event handling and reconciliation never run at the same time
+    work_lock = threading.Lock()
+    reconcile_requested = threading.Event()
+
+    # AppImages waiting for their burst of events to settle, mapped to a monotonic deadline
+    pending = {}
+    pending_changed = threading.Condition()
+
+    def schedule_update(path):
+        """Process path once no further events arrive for DEBOUNCE_DELAY seconds."""
+        with pending_changed:
+            pending[str(path)] = time.monotonic() + DEBOUNCE_DELAY
+            pending_changed.notify()
+
+    def cancel_update(path):
+        with pending_changed:
+            pending.pop(str(path), None)
+
+    # Key in pending for a deferred sweep of all desktop entries
+    full_clean = object()
+
+    def schedule_full_clean():
+        """Sweep all desktop entries FULL_CLEAN_INTERVAL seconds after the first request of a burst."""
+        with pending_changed:
+            if full_clean not in pending:
+                pending[full_clean] = time.monotonic() + FULL_CLEAN_INTERVAL
+                pending_changed.notify()
+
+    def handle_event(event):
+        """Dispatch one inotify event on its mask bits."""
+        if event.mask & flags.Q_OVERFLOW:
+            # Events were dropped, so only a rescan can tell what changed
+            logging.warning("inotify event queue overflowed, scheduling a reconcile")
+            reconcile_requested.set()
+            return
+        if event.mask & (flags.DELETE_SELF | flags.MOVE_SELF):
+            # The watch is gone; exit so systemd's Restart=always sets it up again
+            logging.error(f"Watch directory {WATCH_DIR} was removed or moved, exiting")
+            sys.exit(1)
+        if event.mask & flags.ISDIR or not _is_appimage(event.name):
+            return
+        path = os.path.join(watch_path, event.name)
+        
+        if event.mask & flags.CREATE:
+            logging.debug(f"CREATE event detected: {path}")
+            logging.info(f"New AppImage detected: {path}")
+            # A copied or downloaded file is handled at its CLOSE_WRITE; only links
+            # arrive complete, with no writer to wait for
+            try:
+                st = os.lstat(path)
+                is_symlink = stat.S_ISLNK(st.st_mode)
+                if is_symlink:
+                    st = os.stat(path)
+            except OSError:
+                return
+            if stat.S_ISREG(st.st_mode) and (is_symlink or st.st_nlink > 1):
+                schedule_update(path)
+        elif event.mask & flags.CLOSE_WRITE:
+            # Act once the writer has finished rather than on every MODIFY
+            logging.debug(f"CLOSE_WRITE event detected: {path}")
+            schedule_update(path)
+        elif event.mask & flags.ATTRIB:
+            # chmod +x makes an AppImage extractable, so rebuild an entry made without its icon
+            logging.debug(f"ATTRIB event detected: {path}")
+            schedule_update(path)
+        elif event.mask & flags.MOVED_TO:
+            logging.debug(f"MOVED_TO event detected: {path}")
+            logging.info(f"AppImage moved/renamed to: {path}")
+            schedule_update(path)
+        elif event.mask & (flags.DELETE | flags.MOVED_FROM):
+            moved = event.mask & flags.MOVED_FROM
+            logging.debug(f"{'MOVED_FROM' if moved else 'DELETE'} event detected: {path}")
+            logging.info(f"AppImage moved/renamed from: {path}" if moved else f"AppImage removed: {path}")
+            cancel_update(path)
+            clean_desktop_files([path])
+            if processed_files.pop(path, None):
+                save_state()
+            
+            # The targeted cleanup only finds entries named after the AppImage; one deferred
+            # sweep on the update worker catches any others for every rename in the burst
+            if moved:
+                schedule_full_clean()
+
+    def update_worker():
+        """Process scheduled AppImages and sweeps once their deadline has passed."""
+        while True:
+            with pending_changed:
+                while True:
+                    now = time.monotonic()
+                    due = [path for path, deadline in pending.items() if deadline <= now]
+                    if due:
+                        break
+                    # Sleep until the earliest deadline, or until something is scheduled
+                    pending_changed.wait(min(pending.values()) - now if pending else None)
+                for path in due:
+                    del pending[path]
+
+            with work_lock:
+                for path in due:
+                    try:
+                        if path is full_clean:
+                            clean_desktop_files()
+                        else:
+                            update_appimage(path)
+                    except Exception as e:
+                        logging.error(f"Error updating {'desktop entries' if path is full_clean else path}: {e}", exc_info=True)
+
+    def reconcile_worker():
+        """Reconcile on SIGHUP, and otherwise every RECONCILE_INTERVAL seconds."""
+        while True:
+            reconcile_requested.wait(RECONCILE_INTERVAL)
+            reconcile_requested.clear()
+            logging.info("Reconciling desktop entries with the watch directory...")
+            with work_lock:
+                try:
+                    reconcile_appimages()
+                except Exception as e:
+                    logging.error(f"Error during reconciliation: {e}", exc_info=True)
 
     try:
+        # Create output directories once, not on every event
+        ensure_directories()
+
         # Initialize inotify
-        wm = pyinotify.WatchManager()
-        handler = EventHandler()
-        notifier = pyinotify.Notifier(wm, handler)
+        inotify = INotify()
 
         # Add watch with necessary events
-        mask = (pyinotify.IN_CREATE | 
-                pyinotify.IN_DELETE | 
-                pyinotify.IN_MODIFY | 
-                pyinotify.IN_MOVED_FROM | 
-                pyinotify.IN_MOVED_TO | 
-                pyinotify.IN_DELETE_SELF |
-                pyinotify.IN_MOVE_SELF)
+        mask = (flags.CREATE | 
+                flags.DELETE | 
+                flags.CLOSE_WRITE | 
+                flags.ATTRIB | 
+                flags.MOVED_FROM | 
+                flags.MOVED_TO | 
+                flags.DELETE_SELF |
+                flags.MOVE_SELF)
         
-        watch_path = str(WATCH_DIR)
         logging.info(f"Setting up watch on {watch_path}")
         
         # Add the watch and check the result
-        watch_id = wm.add_watch(watch_path, mask)
-        if watch_path not in watch_id or watch_id[watch_path] < 0:
-            logging.error(f"Failed to add watch for {watch_path}: {watch_id}")
+        try:
+            inotify.add_watch(watch_path, mask)
+        except OSError as e:
+            logging.error(f"Failed to add watch for {watch_path}: {e}")
             sys.exit(1)
 
-        # Process existing AppImages first
-        logging.info("Processing existing AppImages...")
-        for appimage in WATCH_DIR.glob("*.AppImage"):
-            desktop_file = DESKTOP_DIR / f"{appimage.stem}.desktop"
-            if needs_update(appimage, desktop_file):
-                create_desktop_file(appimage)
+        # Pick up what was known to be current before the last shutdown
+        load_state()
+        atexit.register(save_state)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))  # systemctl stop runs atexit too
+        # Install before the initial pass, which can take minutes, so an early reload doesn't kill us;
+        # a SIGHUP that arrives during it just queues another rescan
+        signal.signal(signal.SIGHUP, lambda signum, frame: reconcile_requested.set())
 
-        # Clean up any stale desktop files
-        logging.info("Performing initial cleanup...")
-        clean_desktop_files()
+        # Process existing AppImages and clean up any stale desktop files
+        logging.info("Processing existing AppImages and performing initial cleanup...")
+        reconcile_appimages()
+
+        # Sleep until SIGHUP (e.g. systemctl reload) or the hourly timer asks for a rescan
+        threading.Thread(target=reconcile_worker, name="reconcile", daemon=True).start()
+        threading.Thread(target=update_worker, name="update", daemon=True).start()
 
         logging.info(f"Starting inotify watch loop on {WATCH_DIR}")
-        notifier.loop()
+        while True:
+            # Block until events arrive, then give the rest of a burst 100 ms to be read in the same batch
+            events = inotify.read(read_delay=100)
+            with work_lock:
+                for event in events:
+                    handle_event(event)
 
     except Exception as e:
         logging.error(f"Error in monitor loop: {str(e)}")
@@ -340,62 +1040,55 @@ def monitor_appimages():
         sys.exit(1)
 
 def get_appimage_metadata(appimage_path):
-    """Get metadata for an AppImage including modification time and hash."""
+    """Get metadata for an AppImage including modification time (in ns), permission bits and hash."""
     try:
-        mtime = os.path.getmtime(appimage_path)
-        with open(appimage_path, 'rb') as f:
-            file_hash = hashlib.md5(f.read()).hexdigest()[:8]
-        return {'mtime': mtime, 'hash': file_hash}
+        # Stat before hashing, so a write in between shows up as a changed mtime later
+        st = os.stat(appimage_path)
+        file_hash = _file_hash(appimage_path)
+        return {'mtime_ns': st.st_mtime_ns, 'mode': stat.S_IMODE(st.st_mode), 'hash': file_hash}
     except Exception as e:
         logging.error(f"Error getting metadata for {appimage_path}: {e}")
         return None
 
 def needs_update(appimage_path, desktop_file_path):
-    """Check if the desktop file needs to be updated."""
+    """Check if the desktop file needs to be updated.
+    
+    Returns (needs_update, metadata) so callers can hand the metadata on to
+    create_desktop_file instead of computing it again; metadata is None when
+    it was not computed.
+    """
     if not desktop_file_path.exists():
-        return True
+        return True, None
         
+    current_metadata = None
     try:
-        # Get current AppImage metadata
-        current_metadata = get_appimage_metadata(appimage_path)
-        if not current_metadata:
-            return True
-            
-        # Read existing desktop file
-        with open(desktop_file_path, 'r') as f:
-            content = f.read()
-            
-        # Extract stored hash and timestamp
-        stored_hash = None
-        stored_time = None
-        for line in content.splitlines():
-            if line.startswith('X-AppImage-Hash='):
-                stored_hash = line.split('=')[1]
-            elif line.startswith('X-AppImage-LastUpdate='):
-                stored_time = float(line.split('=')[1])
+        # Extract stored hash and timestamp from the existing desktop file
+        fields = read_desktop_fields(desktop_file_path)
+        stored_hash = fields.get('X-AppImage-Hash')
+        stored_time = int(fields['X-AppImage-LastUpdate']) if 'X-AppImage-LastUpdate' in fields else None
                 
         if not stored_hash or not stored_time:
-            return True
-            
-        # Check if metadata matches
-        return (stored_hash != current_metadata['hash'] or 
-                abs(stored_time - current_metadata['mtime']) > 1)  # 1 second tolerance
+            return True, None
+        
+        # An unchanged mtime means an unchanged AppImage; don't open it at all. The entry
+        # stores st_mtime_ns exactly, so any later write shows up as a mismatch. The mode
+        # is compared too: an entry built before chmod +x has only the fallback icon
+        st = os.stat(appimage_path)
+        if stored_time == st.st_mtime_ns and fields.get('X-AppImage-Mode') == f"{stat.S_IMODE(st.st_mode):o}":
+            return False, None
+        
+        # The entry records the old mtime or mode either way, so it needs rewriting; hash
+        # now so create_desktop_file can reuse the icon when only the mtime moved
+        current_metadata = get_appimage_metadata(appimage_path)
+        return True, current_metadata
                 
     except Exception as e:
         logging.error(f"Error checking update status for {appimage_path}: {e}")
-        return True
+        return True, current_metadata
 
 def debug_systemd_service():
     """Debug systemd service status and configuration."""
     try:
-        # Check if systemd is running
-        systemd_status = subprocess.run(
-            ["systemctl", "--user", "status"],
-            capture_output=True, text=True
-        )
-        logging.info("Systemd user service status:")
-        logging.info(systemd_status.stdout)
-
         # Check service file existence and permissions
         if SERVICE_FILE_PATH.exists():
             perms = oct(SERVICE_FILE_PATH.stat().st_mode)[-3:]
@@ -406,16 +1099,20 @@ def debug_systemd_service():
         else:
             logging.error("Service file does not exist!")
 
-        # Check service status
+        # Check service status; one machine-readable query instead of separate status calls
         service_status = subprocess.run(
-            ["systemctl", "--user", "status", SERVICE_NAME],
+            ["systemctl", "--user", "show", SERVICE_NAME, "--no-pager",
+             "--property=" + ",".join(DEBUG_SERVICE_PROPERTIES)],
             capture_output=True, text=True
         )
-        logging.info("Service status output:")
-        logging.info(service_status.stdout)
-        if service_status.stderr:
-            logging.error("Service status errors:")
+        if service_status.returncode != 0:
+            logging.error("Could not query the systemd user manager:")
             logging.error(service_status.stderr)
+        else:
+            properties = dict(line.split("=", 1) for line in service_status.stdout.splitlines() if "=" in line)
+            logging.info("Service status:")
+            for name in DEBUG_SERVICE_PROPERTIES:
+                logging.info(f"  {name}={properties.get(name, '')}")
 
         # Check journal logs
         journal_logs = subprocess.run(
@@ -437,7 +1134,7 @@ def install_user_service():
         script_path = ensure_script_in_watch_dir()
         
         # Verify Python executable
-        python_path = shutil.which('python3')
+        python_path = _python3_path()
         if not python_path:
             logging.error("Could not find python3 executable!")
             return False
@@ -456,6 +1153,7 @@ Environment="DESKTOP_ENTRY_DIR={DESKTOP_DIR}"
 Environment="ICON_DIR={ICON_DIR}"
 Environment="PYTHONUNBUFFERED=1"
 ExecStart={python_path} {script_path}
+ExecReload=/bin/kill -HUP $MAINPID
 Restart=always
 RestartSec=5
 StandardOutput=journal
@@ -468,7 +1166,7 @@ WantedBy=default.target
 """
 
         # Ensure ~/.config/systemd/user exists
-        SERVICE_FILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(SERVICE_FILE_PATH.parent)
 
         # Write service file
         with open(SERVICE_FILE_PATH, "w") as f:
@@ -530,6 +1228,8 @@ if __name__ == "__main__":
             sys.exit(1)
     elif "--debug" in sys.argv:
         debug_systemd_service()
+    elif "--full-scan" in sys.argv:
+        clean_desktop_files()
     else:
         # Check if script is in watch directory
         current_script = Path(sys.argv[0]).resolve()